@@ -10,8 +10,7 @@ def parse(text) -> List[Node]:
     representation.
     See parse_to_dict for a more generic string representation.
     """
-    tokens = list(lex(text))
-    return parse_tokens(tokens)
+    return parse_tokens(lex(text))
 
 
 def parse_to_dict(text) -> List[Dict[str, Any]]:
@@ -1,7 +1,12 @@
 import re
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional, List, Generator
+from typing import Optional, List, Generator, Pattern, Dict, Tuple
+
+# there are lots of tokens and nodes, so we don't want each of them to carry its own
+# __dict__. dataclasses only support generating __slots__ since Python 3.10, though
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
 
 class TokenType(Enum):
@@ -23,17 +28,48 @@ class TokenType(Enum):
     CODE_BLOCK_DELIMITER = 16
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Token:
     token_type: TokenType
     value: str
     groups: Optional[List[str]] = None
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class LexingRule:
     token_type: TokenType
+    # literal text that every match of the pattern starts with.
+    # the lexer only tries this rule at positions where the input text starts with the
+    # first two characters of the prefix
+    prefix: str
+    # rules without a pattern match exactly their prefix
     pattern: Optional[str] = None
+    compiled: Pattern[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # compile once instead of going through re's internal cache on every match
+        if self.pattern is not None:
+            self.compiled = re.compile(self.pattern)
+        else:
+            self.compiled = re.compile(re.escape(self.prefix))
+
+
+@dataclass(**DATACLASS_SLOTS)
+class CombinedLexingRules:
+    """
+    A set of lexing rules whose patterns have been joined into a single alternation,
+    so that they can be tried in one go.
+
+    If all of the rules just match their prefix, then there is no pattern and the
+    prefixes are compared directly instead.
+    """
+
+    pattern: Optional[Pattern[str]]
+    # maps the group name of each rule to its token type and the slice of
+    # match.groups() that holds the rule's own groups
+    rule_groups: Dict[str, Tuple[TokenType, int, int]]
+    # prefix and token type of each rule, in order, if there is no pattern
+    literals: Tuple[Tuple[str, TokenType], ...] = ()
 
 
 def lex(input_text: str) -> Generator[Token, None, None]:
@@ -61,60 +97,191 @@ def lex(input_text: str) -> Generator[Token, None, None]:
     # So we're going to continue scanning until we arrive at something that is not just
     # text, at which point we're going to output all the text we've found as a single
     # text token.
-    seen_simple_text = ""
+    #
+    # Instead of cutting off the part of the input text we've already looked at, we're
+    # only moving a cursor forward, so that we don't copy the entire rest of the text
+    # for every character.
+    pos = 0
+    simple_text_start = 0
+
+    # this loop runs once per token and once per rule prefix that doesn't start
+    # a token, so we're looking up everything it needs only once
+    text_length = len(input_text)
+    search_token_start = TOKEN_START_REGEX.search
+    token_at = lex_token_at
 
     while True:
-        if len(input_text) == 0:
-            if len(seen_simple_text) > 0:
-                yield Token(TokenType.TEXT_INLINE, seen_simple_text)
+        if pos >= text_length:
+            if pos > simple_text_start:
+                yield Token(TokenType.TEXT_INLINE, input_text[simple_text_start:pos])
             return
 
-        for rule in lexing_rules:
-            match = re.match(rule.pattern, input_text)
-            if match is not None:
-                matching_rule = rule
-                break
-        else:
-            seen_simple_text += input_text[0]
-            input_text = input_text[1:]
-            continue  # don't yield a token in this run
+        token = token_at(input_text, pos)
 
-        # cut off matched part
-        input_text = input_text[len(match[0]):]
+        if token is None:
+            # none of the rules can match before the next prefix of a rule,
+            # so we can skip right to it
+            next_token_start = search_token_start(input_text, pos + 1)
+            if next_token_start is None:
+                pos = text_length
+            else:
+                pos = next_token_start.start()
+            continue  # don't yield a token in this run
 
         # yield inline text if we have some left
-        if len(seen_simple_text) > 0:
-            yield Token(TokenType.TEXT_INLINE, seen_simple_text)
-            seen_simple_text = ""
+        if pos > simple_text_start:
+            yield Token(TokenType.TEXT_INLINE, input_text[simple_text_start:pos])
 
-        groups = None
-        if len(match.groups()) > 0:
-            groups = match.groups()
+        # move past matched part
+        pos += len(token.value)
+        simple_text_start = pos
 
-        yield Token(matching_rule.token_type, match[0], groups)
+        yield token
 
 
-# stolen from https://www.urlregex.com/
-URL_REGEX = (
-    r"http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+"
-)
+def lex_token_at(input_text: str, pos: int) -> Optional[Token]:
+    """
+    Tries to match the lexing rules at the specified position of the input text.
+
+    Only the rules whose prefix starts like the next one or two characters are tried,
+    see lexing_rules_by_prefix.
+
+    Returns the token for the first rule that matches, or None if no rule matches.
+    """
+    combined_rules = lexing_rules_by_prefix.get(input_text[pos : pos + 2])
+    if combined_rules is None:
+        combined_rules = lexing_rules_by_prefix.get(input_text[pos])
+        if combined_rules is None:
+            return None
+
+    if combined_rules.pattern is None:
+        for literal, token_type in combined_rules.literals:
+            if input_text.startswith(literal, pos):
+                return Token(token_type, literal)
+        return None
+
+    match = combined_rules.pattern.match(input_text, pos)
+    if match is None:
+        return None
+
+    # the name of the outermost group tells us which rule matched.
+    # every alternative of the pattern is a named group, so there always is one
+    assert match.lastgroup is not None
+    token_type, first_group, end_group = combined_rules.rule_groups[match.lastgroup]
+    groups = None
+    if end_group > first_group:
+        groups = match.groups()[first_group:end_group]
+
+    return Token(token_type, match[0], groups)
+
+
+# originally stolen from https://www.urlregex.com/, which uses
+#   http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+
+# note that [$-_] in there is the character range from "$" to "_", which already
+# contains all digits, uppercase letters, "%" and all the other punctuation of the
+# alternatives except for "!". so the whole alternation accepts exactly the same URLs
+# as this single character class, which the regex engine can scan in a tight loop
+# instead of trying five alternatives (and backtracking into them) for every character
+URL_REGEX = r"https?://[!$-_a-z]+"
 
 lexing_rules = [
-    LexingRule(token_type=TokenType.USER_MENTION, pattern="<@!?([0-9]+)>"),
-    LexingRule(token_type=TokenType.ROLE_MENTION, pattern="<@&([0-9]+)>"),
-    LexingRule(token_type=TokenType.CHANNEL_MENTION, pattern="<#([0-9]+)>"),
+    LexingRule(token_type=TokenType.USER_MENTION, prefix="<@", pattern="<@!?([0-9]+)>"),
+    LexingRule(token_type=TokenType.ROLE_MENTION, prefix="<@&", pattern="<@&([0-9]+)>"),
     LexingRule(
-        token_type=TokenType.EMOJI_CUSTOM, pattern="<:([a-zA-Z0-9_]{2,}):([0-9]+)>"
+        token_type=TokenType.CHANNEL_MENTION, prefix="<#", pattern="<#([0-9]+)>"
     ),
-    LexingRule(token_type=TokenType.EMOJI_UNICODE_ENCODED, pattern=":([a-zA-Z0-9_]+):"),
-    LexingRule(token_type=TokenType.URL_WITHOUT_PREVIEW, pattern=f"<{URL_REGEX}>"),
-    LexingRule(token_type=TokenType.URL_WITH_PREVIEW, pattern=URL_REGEX),
-    LexingRule(token_type=TokenType.QUOTE_LINE_PREFIX, pattern=r"(>>)?> "),
-    LexingRule(token_type=TokenType.TILDE, pattern=r"~"),
-    LexingRule(token_type=TokenType.STAR, pattern=r"\*"),
-    LexingRule(token_type=TokenType.UNDERSCORE, pattern=r"_"),
-    LexingRule(token_type=TokenType.SPOILER_DELIMITER, pattern=r"\|\|"),
-    LexingRule(token_type=TokenType.CODE_BLOCK_DELIMITER, pattern=r"```"),
-    LexingRule(token_type=TokenType.CODE_INLINE_DELIMITER, pattern=r"`"),
-    LexingRule(token_type=TokenType.NEWLINE, pattern="\n"),
+    LexingRule(
+        token_type=TokenType.EMOJI_CUSTOM,
+        prefix="<:",
+        pattern="<:([a-zA-Z0-9_]{2,}):([0-9]+)>",
+    ),
+    LexingRule(
+        token_type=TokenType.EMOJI_UNICODE_ENCODED,
+        prefix=":",
+        pattern=":([a-zA-Z0-9_]+):",
+    ),
+    LexingRule(
+        token_type=TokenType.URL_WITHOUT_PREVIEW,
+        prefix="<http",
+        pattern=f"<{URL_REGEX}>",
+    ),
+    LexingRule(token_type=TokenType.URL_WITH_PREVIEW, prefix="http", pattern=URL_REGEX),
+    LexingRule(token_type=TokenType.QUOTE_LINE_PREFIX, prefix=">", pattern=r"(>>)?> "),
+    LexingRule(token_type=TokenType.TILDE, prefix="~"),
+    LexingRule(token_type=TokenType.STAR, prefix="*"),
+    LexingRule(token_type=TokenType.UNDERSCORE, prefix="_"),
+    LexingRule(token_type=TokenType.SPOILER_DELIMITER, prefix="||"),
+    LexingRule(token_type=TokenType.CODE_BLOCK_DELIMITER, prefix="```"),
+    LexingRule(token_type=TokenType.CODE_INLINE_DELIMITER, prefix="`"),
+    LexingRule(token_type=TokenType.NEWLINE, prefix="\n"),
 ]
+
+
+def group_rules_by_prefix(
+    rules: List[LexingRule],
+) -> Dict[str, CombinedLexingRules]:
+    """
+    Groups the lexing rules by the first two characters of their prefix and combines
+    the rules of each group, keeping the order in which they appear in the input list.
+
+    Rules with a single-character prefix are also added to the groups of all longer
+    prefixes that start with that character. This way, the group found for the next two
+    characters of the input text always contains every rule that could match there.
+    """
+    keys = dict.fromkeys(rule.prefix[:PREFIX_KEY_LENGTH] for rule in rules)
+    return {
+        key: combine_rules(
+            [rule for rule in rules if key.startswith(rule.prefix[:PREFIX_KEY_LENGTH])]
+        )
+        for key in keys
+    }
+
+
+def combine_rules(rules: List[LexingRule]) -> CombinedLexingRules:
+    """
+    Combines the patterns of the lexing rules into a single pattern that tries them in
+    the given order.
+
+    Each rule's pattern is wrapped in a group named after its token type. The rules'
+    own patterns must therefore not contain named groups or backreferences.
+
+    If none of the rules have a pattern, i.e., all of them just match their prefix,
+    no regex is created at all, see CombinedLexingRules.
+    """
+    if all(rule.pattern is None for rule in rules):
+        literals = tuple((rule.prefix, rule.token_type) for rule in rules)
+        return CombinedLexingRules(None, {}, literals)
+
+    pattern = re.compile(
+        "|".join(
+            f"(?P<{rule.token_type.name}>{rule.compiled.pattern})" for rule in rules
+        )
+    )
+
+    rule_groups = {}
+    for rule in rules:
+        # groupindex is 1-based while match.groups() is 0-based, so the groups
+        # following the rule's named group start at exactly that index
+        first_group = pattern.groupindex[rule.token_type.name]
+        end_group = first_group + rule.compiled.groups
+        rule_groups[rule.token_type.name] = (rule.token_type, first_group, end_group)
+
+    return CombinedLexingRules(pattern, rule_groups)
+
+
+# a rule can only match if the input text starts with its prefix, so we only have to
+# try the few rules that share the next two characters of the input text, which most
+# of the time is a single rule
+PREFIX_KEY_LENGTH = 2
+lexing_rules_by_prefix = group_rules_by_prefix(lexing_rules)
+
+# no token can start anywhere but at one of the rules' prefixes.
+# this is used to skip over plain text: the regex engine scans for the first characters
+# of the prefixes and checks the rest of them in C, so the lexer loop only has to look
+# at positions where a token can actually start and not at, e.g., every single "h"
+TOKEN_START_REGEX = re.compile(
+    "|".join(
+        re.escape(prefix)
+        for prefix in dict.fromkeys(rule.prefix for rule in lexing_rules)
+    )
+)
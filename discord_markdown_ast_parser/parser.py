@@ -1,9 +1,10 @@
 import re
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional, Generator, Any, List, Dict, Tuple, Iterable
+from itertools import chain
+from typing import Optional, Generator, Any, List, Dict, Tuple, Iterable, Callable
 
-from discord_markdown_ast_parser.lexer import Token, TokenType
+from discord_markdown_ast_parser.lexer import DATACLASS_SLOTS, Token, TokenType
 
 
 class NodeType(Enum):
@@ -25,7 +26,7 @@ class NodeType(Enum):
     CODE_INLINE = 16
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Node:
     node_type: NodeType
 
@@ -42,58 +43,150 @@ class Node:
     children: Optional[List["Node"]] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        # copy all properties that are not None
-        self_dict = {k: v for k, v in self.__dict__.items() if v is not None}
-
-        # convert NodeType to string
-        self_dict["node_type"] = self.node_type.name
-
-        # recursively convert children to dict
-        if self.children is not None:
-            self_dict["children"] = [node.to_dict() for node in self.children]
+        # the children are converted through a stack of nodes and the lists their
+        # dicts go into instead of recursing, so that deeply nested nodes neither pay
+        # for a method call per node nor run into Python's recursion limit
+        converted: List[Dict[str, Any]] = []
+        stack: List[Tuple[Node, List[Dict[str, Any]]]] = [(self, converted)]
+        while len(stack) > 0:
+            node, node_dicts = stack.pop()
+
+            # convert NodeType to string
+            node_dict: Dict[str, Any] = {"node_type": node_type_names[node.node_type]}
+
+            # copy all other properties that are not None
+            # (spelled out instead of going through all fields, as this runs for
+            # every node)
+            if node.text_content is not None:
+                node_dict["text_content"] = node.text_content
+            if node.discord_id is not None:
+                node_dict["discord_id"] = node.discord_id
+            if node.emoji_name is not None:
+                node_dict["emoji_name"] = node.emoji_name
+            if node.code_lang is not None:
+                node_dict["code_lang"] = node.code_lang
+            if node.url is not None:
+                node_dict["url"] = node.url
+
+            node_dicts.append(node_dict)
+
+            # convert children to dict
+            if node.children is not None:
+                children_dicts: List[Dict[str, Any]] = []
+                node_dict["children"] = children_dicts
+                # the last child is pushed first so that the children are converted
+                # (and appended) in order
+                stack.extend(
+                    [(child, children_dicts) for child in reversed(node.children)]
+                )
+
+        return converted[0]
+
+
+# the names of the node types, looked up once instead of going through Enum.name for
+# every node that is converted to a dict
+node_type_names: Dict[NodeType, str] = {
+    node_type: node_type.name for node_type in NodeType
+}
+
+
+# node types without children that are created directly from a single token,
+# looked up by the token's type.
+# inline text is not in here as it is merged with neighbouring text
+simple_node_builders: Dict[TokenType, Callable[[Token], Node]] = {
+    # user mentions
+    TokenType.USER_MENTION: lambda token: Node(
+        NodeType.USER, discord_id=int(token.groups[0])
+    ),
+    # role mentions
+    TokenType.ROLE_MENTION: lambda token: Node(
+        NodeType.ROLE, discord_id=int(token.groups[0])
+    ),
+    # channel mentions
+    TokenType.CHANNEL_MENTION: lambda token: Node(
+        NodeType.CHANNEL, discord_id=int(token.groups[0])
+    ),
+    # custom emoji
+    TokenType.EMOJI_CUSTOM: lambda token: Node(
+        NodeType.EMOJI_CUSTOM,
+        discord_id=int(token.groups[1]),
+        emoji_name=token.groups[0],
+    ),
+    # unicode emoji (when it's encoded as :name: and not just written as unicode)
+    TokenType.EMOJI_UNICODE_ENCODED: lambda token: Node(
+        NodeType.EMOJI_UNICODE_ENCODED, emoji_name=token.groups[0]
+    ),
+    # URL with preview
+    TokenType.URL_WITH_PREVIEW: lambda token: Node(
+        NodeType.URL_WITH_PREVIEW, url=token.value
+    ),
+    # URL without preview
+    TokenType.URL_WITHOUT_PREVIEW: lambda token: Node(
+        NodeType.URL_WITHOUT_PREVIEW, url=token.value[1:-1]
+    ),
+}
+
+# the same, but indexed by the type tag of the token, see encode_token_types.
+# the parser already has the type tags at hand, and indexing a list with them is
+# quicker than hashing the token type for a dict lookup
+simple_node_builders_by_tag: List[Optional[Callable[[Token], Node]]] = [None] * 256
+for token_type, simple_node_builder in simple_node_builders.items():
+    simple_node_builders_by_tag[token_type.value] = simple_node_builder
+
+
+# matches the first line of a code block if it is a language specifier (or empty)
+LANG_SPEC_REGEX = re.compile(r"[a-zA-Z0-9-]*")
+
+
+def parse_tokens(tokens: Iterable[Token]) -> List[Node]:
+    """
+    Parses the lexed tokens into a list of nodes, see parse_token_range.
 
-        return self_dict
+    The tokens can be passed in directly from the lexer, they're put into a list only
+    once here (unless they're already in one) and only indexed from then on.
+    """
+    if not isinstance(tokens, list):
+        tokens = list(tokens)
+    return parse_token_range(tokens)
 
 
-def parse_tokens(tokens: List[Token]) -> List[Node]:
+def parse_tokens_generator(
+    tokens: List[Token],
+    in_quote=False,
+    start: int = 0,
+    end: Optional[int] = None,
+    type_tags: Optional[bytes] = None,
+) -> Generator[Node, None, None]:
     """
-    This is a temporary workaround to combat a shortcoming of parse_tokens_generator.
-    The interesting code is in parse_tokens_generator. You will find a description of
-    this shortcoming in a comment at the end of parse_tokens_generator.
+    Yields the nodes produced by parse_token_range, see there.
     """
-    return merge_text_nodes(parse_tokens_generator(tokens))
+    yield from parse_token_range(tokens, in_quote, start, end, type_tags)
 
 
-def merge_text_nodes(subtree: Iterable[Node]) -> List[Node]:
+@dataclass(**DATACLASS_SLOTS)
+class ParseFrame:
     """
-    Recursively goes through a tree of nodes, merging neighbouring TEXT nodes.
-
-    Note that while this function returns an output list, it may change some Node
-    objects in the input. This function is only a temporary workaround anyway.
+    The state of parsing one range of tokens into a list of nodes, i.e., either the
+    root level or the children of a single node.
     """
-    compressed_tree = []
-    prev_text_node = None
-    for node in subtree:
-        if node.node_type == NodeType.TEXT:
-            if prev_text_node is None:
-                prev_text_node = node
-            else:
-                prev_text_node.text_content += node.text_content
-                continue  # don't store this node
-        else:
-            prev_text_node = None
 
-        if node.children is not None:
-            node.children = merge_text_nodes(node.children)
+    tokens: List[Token]
+    type_tags: bytes
+    # index of the next token to parse
+    index: int
+    end: int
+    in_quote: bool
+    # the parsed nodes are appended to this list
+    nodes: List[Node]
 
-        compressed_tree.append(node)
 
-    return compressed_tree
-
-
-def parse_tokens_generator(
-    tokens: List[Token], in_quote=False
-) -> Generator[Node, None, None]:
+def parse_token_range(
+    tokens: List[Token],
+    in_quote=False,
+    start: int = 0,
+    end: Optional[int] = None,
+    type_tags: Optional[bytes] = None,
+) -> List[Node]:
     """
     Scans the lexed tokens and identifies more complex and possibly nested structures
     such as code blocks, quote blocks and text modifiers that can't be identified using
@@ -103,303 +196,358 @@ def parse_tokens_generator(
     then this function will output the nodes in which they appear in the input text.
     Keep in mind, however, that these nodes may have deeply nested children nodes which
     won't appear on the root level.
+    Neighbouring text is always combined into a single TEXT node.
+
+    Only the tokens from start (inclusive) to end (exclusive) are parsed, so that
+    nested nodes can be parsed without copying their part of the token list.
+    The type tags are created from the token list if they are not supplied, see
+    encode_token_types.
+
+    Nested nodes are not parsed by recursion. Instead, once we know where the children
+    of a node begin and end, we put a new frame for them onto a stack and continue with
+    that frame. The parent frame continues after the node once the children are done.
+    This way, deeply nested text modifiers neither pay for a function call (and a
+    generator) per node, nor do they run into Python's recursion limit.
     """
-    i = 0
-    while i < len(tokens):
-        current_token = tokens[i]
-
-        # === simple node types without children
-        # just continue once any of them match
+    if end is None:
+        end = len(tokens)
+    if type_tags is None:
+        type_tags = encode_token_types([token.token_type for token in tokens])
+
+    # the loops below run once per token, so we're looking up the module-level tables
+    # and type tags they need only once
+    text_inline_tag = TEXT_INLINE_TAG
+    code_block_delimiter_tag = CODE_BLOCK_DELIMITER_TAG
+    quote_line_prefix_tag = QUOTE_LINE_PREFIX_TAG
+    newline_tag = NEWLINE_TAG
+    builders_by_tag = simple_node_builders_by_tag
+    modifiers_by_tag = text_modifiers_by_tag
+
+    root_nodes: List[Node] = []
+    stack = [ParseFrame(tokens, type_tags, start, end, in_quote, root_nodes)]
+    while len(stack) > 0:
+        frame = stack[-1]
+        tokens = frame.tokens
+        type_tags = frame.type_tags
+        end = frame.end
+        in_quote = frame.in_quote
+        nodes = frame.nodes
+        # text of the tokens since the last non-TEXT node, see flush_text_run.
+        # a frame only gets interrupted right after appending a non-TEXT node, so this
+        # is always empty when we (re)start working on a frame
+        text_run: List[str] = []
+
+        i = frame.index
+        while i < end:
+            current_token = tokens[i]
+            # comparing the plain int from the type tags is quicker than going
+            # through the token's attribute and the enum class
+            token_tag = type_tags[i]
+
+            # === inline text
+            if token_tag == text_inline_tag:
+                text_run.append(current_token.value)
+                i += 1
+                continue
 
-        # text
-        if current_token.token_type == TokenType.TEXT_INLINE:
-            yield Node(NodeType.TEXT, text_content=current_token.value)
-            i += 1
-            continue
+            # === simple node types without children
+            # just continue once any of them match
+            simple_node_builder = builders_by_tag[token_tag]
+            if simple_node_builder is not None:
+                flush_text_run(nodes, text_run)
+                nodes.append(simple_node_builder(current_token))
+                i += 1
+                continue
 
-        # user mentions
-        if current_token.token_type == TokenType.USER_MENTION:
-            yield Node(NodeType.USER, discord_id=int(current_token.groups[0]))
-            i += 1
-            continue
+            # === text modifiers
+            # these just modify the look of the text (bold, italic, inline code, ...),
+            # can appear everywhere (outside of code blocks) and can span all other
+            # elements (including code blocks) and can span across newlines.
+            # they must have at least one child token.
+            # note, however, that text modifiers (and all other nodes with children),
+            # can not overlap partially:
+            #   strikethrough is completely inside italic, works:
+            #     *a~~b~~c*d = <it>a<s>b</s>c</it>d
+            #   strikethrough only partially overlaps italic, strikethrough is ignored
+            #     *a~~bc*d~~ = <it>a~~bc</it>~~d
+            #
+            # known issue:
+            # we don't account for the fact that spoilers can't wrap code blocks
+
+            # the delimiters and node types are listed in text_modifiers.
+            # we only try the ones that start with the current token, which for most
+            # tokens are none at all
+            # (like bytes.find, -1 means that no closer was found)
+            closer_index = -1
+            for delimiter, node_type in modifiers_by_tag[token_tag]:
+                if len(delimiter) == 1:
+                    # single token delimiters are just the current token, so we can
+                    # skip right to the search for the closer
+                    # (after at least one child token).
+                    closer_index = type_tags.find(delimiter, i + 2, end)
+                else:
+                    closer_index = try_match_node_with_children(
+                        type_tags, i, end, delimiter, delimiter
+                    )
+                if closer_index != -1:
+                    break
 
-        # role mentions
-        if current_token.token_type == TokenType.ROLE_MENTION:
-            yield Node(NodeType.ROLE, discord_id=int(current_token.groups[0]))
-            i += 1
-            continue
+            if closer_index != -1:
+                flush_text_run(nodes, text_run)
+                children: List[Node] = []
+                nodes.append(Node(node_type, children=children))
+                # continue after the closer once the children have been parsed
+                frame.index = closer_index + len(delimiter)
+                stack.append(
+                    ParseFrame(
+                        tokens,
+                        type_tags,
+                        i + len(delimiter),
+                        closer_index,
+                        in_quote,
+                        children,
+                    )
+                )
+                break
 
-        # channel mentions
-        if current_token.token_type == TokenType.CHANNEL_MENTION:
-            yield Node(NodeType.CHANNEL, discord_id=int(current_token.groups[0]))
-            i += 1
-            continue
-
-        # custom emoji
-        if current_token.token_type == TokenType.EMOJI_CUSTOM:
-            yield Node(
-                NodeType.EMOJI_CUSTOM,
-                discord_id=int(current_token.groups[1]),
-                emoji_name=current_token.groups[0],
-            )
-            i += 1
-            continue
-
-        # unicode emoji (when it's encoded as :name: and not just written as unicode)
-        if current_token.token_type == TokenType.EMOJI_UNICODE_ENCODED:
-            yield Node(
-                NodeType.EMOJI_UNICODE_ENCODED,
-                emoji_name=current_token.groups[0],
-            )
-            i += 1
-            continue
+            # === code blocks
+            # these are similar to text modifiers but have some additional twists
+            # - code blocks only contain inline text, all other markdown rules are
+            #   disabled inside code blocks
+            # - the first line can be a language specifier for syntax highlighting.
+            #   - the LS starts immediately after the code block delimiter and is
+            #     immediately followed by a newline, otherwise it is treated as normal
+            #     text content of the code block.
+            #   - if the language specifier is omitted completely, i.e., the code block
+            #     delimiter is immediately followed by a newline, then that newline is
+            #     removed:
+            #       ```
+            #       test
+            #       ```
+            #       is, in HTML, <code-block>test<br /></code-block>
+            #       and not <code-block><br />test<br /></code-block>
+
+            if token_tag == code_block_delimiter_tag:
+                closer_index = type_tags.find(CODE_BLOCK_DELIMITER, i + 1, end)
+                if closer_index != -1:
+                    # treat all children token as inline text
+                    children_content = "".join(
+                        [token.value for token in tokens[i + 1 : closer_index]]
+                    )
+
+                    # check for a language specifier
+                    lang = None
+                    first_newline = children_content.find("\n")
+                    rest_start = first_newline + 1
+                    # there must be at least one other non-empty line
+                    # (the content doesn't matter, there just has to be one), i.e.,
+                    # there must be anything but newlines after the first line
+                    non_empty_line_found = first_newline != -1 and (
+                        children_content.count("\n", rest_start)
+                        < len(children_content) - rest_start
+                    )
+                    if non_empty_line_found:
+                        match = LANG_SPEC_REGEX.fullmatch(
+                            children_content, 0, first_newline
+                        )
+                        # if there is anything else in the first line, then it is
+                        # normal text.
+                        # otherwise, it is either a lang spec (gets removed from the
+                        # displayed text) or it is empty (newline gets removed)
+                        if match is not None:
+                            if first_newline > 0:
+                                lang = children_content[:first_newline]
+                            # remove first line from code block
+                            children_content = children_content[rest_start:]
+
+                    child_node = Node(NodeType.TEXT, text_content=children_content)
+                    flush_text_run(nodes, text_run)
+                    nodes.append(
+                        Node(NodeType.CODE_BLOCK, code_lang=lang, children=[child_node])
+                    )
+                    i = closer_index + 1
+                    continue
+
+            # === quote blocks
+            # these are a bit trickier. essentially, quote blocks are also
+            # "just another text modifier" but with a few more complicated rules
+            # - quote blocks always have "> " at the very beginning of every line
+            # - quote blocks can span multiple lines, meaning that if multiple
+            #   consecutive lines start with "> ", then they belong to the same quote
+            #   block
+            # - quote blocks can't be nested. any quote delimiters inside a quote block
+            #   are just inline text. all other elements can appear inside a quote block
+            # - text modifiers
+            # the quote line prefix is only checked outside of quote blocks, so that all
+            # other tokens (and everything inside a quote block) skip this part entirely
+            if not in_quote and token_tag == quote_line_prefix_tag:
+                # (start, end) index pairs of the children token of each line
+                quote_line_ranges: List[Tuple[int, int]] = []
+                while i < end and type_tags[i] == quote_line_prefix_tag:
+                    # search for the next newline
+                    # (the type tags are searched in C, just like closers are)
+                    newline_index = type_tags.find(newline_tag, i, end)
+                    if newline_index == -1:
+                        # this is the last line,
+                        # all remaining tokens are part of the quote block
+                        quote_line_ranges.append((i + 1, end))
+                        i = end  # move to the end
+                        break
 
-        # URL with preview
-        if current_token.token_type == TokenType.URL_WITH_PREVIEW:
-            yield Node(NodeType.URL_WITH_PREVIEW, url=current_token.value)
-            i += 1
-            continue
+                    # everything from the quote line prefix (non-inclusive)
+                    # to the newline (inclusive) are children token
+                    quote_line_ranges.append((i + 1, newline_index + 1))
+                    i = newline_index + 1  # move to the token after the newline
+
+                # the lines are separated by the quote line prefixes, so the children
+                # token are put into a list of their own, all lines at once.
+                # their type tags are taken from ours instead of encoding them again
+                children_token_in_quote_block = list(
+                    chain.from_iterable(
+                        [
+                            tokens[line_start:line_end]
+                            for line_start, line_end in quote_line_ranges
+                        ]
+                    )
+                )
+                if len(children_token_in_quote_block) > 0:
+                    flush_text_run(nodes, text_run)
+                    children = []
+                    nodes.append(Node(NodeType.QUOTE_BLOCK, children=children))
+                    # continue after the quote block once the children have been parsed
+                    frame.index = i
+                    # tell the inner frame that it's now inside a quote block
+                    stack.append(
+                        ParseFrame(
+                            children_token_in_quote_block,
+                            b"".join(
+                                [
+                                    type_tags[line_start:line_end]
+                                    for line_start, line_end in quote_line_ranges
+                                ]
+                            ),
+                            0,
+                            len(children_token_in_quote_block),
+                            True,
+                            children,
+                        )
+                    )
+                    break
 
-        # URL without preview
-        if current_token.token_type == TokenType.URL_WITHOUT_PREVIEW:
-            yield Node(NodeType.URL_WITHOUT_PREVIEW, url=current_token.value[1:-1])
+            # if we get all the way here, than whatever token we're currently sitting
+            # on is not an inline text token but also failed to match any of our
+            # parsing rules.
+            # this happens when a special character, such as ">" or "*" is used as part
+            # of normal text.
+            # in this case, we just treat it as normal text, which gets combined with
+            # any neighbouring text.
+            text_run.append(current_token.value)
             i += 1
-            continue
-
-        # === text modifiers
-        # these just modify the look of the text (bold, italic, inline code, ...),
-        # can appear everywhere (outside of code blocks) and can span all other
-        # elements (including code blocks) and can span across newlines.
-        # they must have at least one child token.
-        # note, however, that text modifiers (and all other nodes with children),
-        # can not overlap partially:
-        #   strikethrough is completely inside italic, works:
-        #     *a~~b~~c*d = <it>a<s>b</s>c</it>d
-        #   strikethrough only partially overlaps italic, strikethrough is ignored
-        #     *a~~bc*d~~ = <it>a~~bc</it>~~d
-        #
-        # known issue:
-        # we don't account for the fact that spoilers can't wrap code blocks
-
-        # format: delimiter, type
-        text_modifiers = [
-            ([TokenType.STAR, TokenType.STAR], NodeType.BOLD),
-            ([TokenType.UNDERSCORE, TokenType.UNDERSCORE], NodeType.UNDERLINE),
-            ([TokenType.TILDE, TokenType.TILDE], NodeType.STRIKETHROUGH),
-            ([TokenType.STAR], NodeType.ITALIC),
-            ([TokenType.UNDERSCORE], NodeType.ITALIC),
-            ([TokenType.SPOILER_DELIMITER], NodeType.SPOILER),
-            ([TokenType.CODE_INLINE_DELIMITER], NodeType.CODE_INLINE),
-        ]
-
-        node, amount_consumed_tokens = None, None
-        for delimiter, node_type in text_modifiers:
-            node, amount_consumed_tokens = try_parse_node_with_children(
-                tokens[i:], delimiter, delimiter, node_type, in_quote
-            )
-            if node is not None:
-                break
+        else:
+            # all tokens of this frame are parsed
+            flush_text_run(nodes, text_run)
+            stack.pop()
 
-        if node is not None:
-            i += amount_consumed_tokens
-            yield node
-            continue
-
-        # === code blocks
-        # these are similar to text modifiers but have some additional twists
-        # - code blocks only contain inline text, all other markdown rules are disabled
-        #   inside code blocks
-        # - the first line can be a language specifier for syntax highlighting.
-        #   - the LS starts immediately after the code block delimiter and is
-        #     immediately followed by a newline, otherwise it is treated as normal
-        #     text content of the code block.
-        #   - if the language specifier is omitted completely, i.e., the code block
-        #     delimiter is immediately followed by a newline, then that newline is
-        #     removed:
-        #       ```
-        #       test
-        #       ```
-        #       is, in HTML, <code-block>test<br /></code-block>
-        #       and not <code-block><br />test<br /></code-block>
-
-        if current_token.token_type == TokenType.CODE_BLOCK_DELIMITER:
-            children_token, amount_consumed_tokens = search_for_closer(
-                tokens[i + 1 :], [TokenType.CODE_BLOCK_DELIMITER]
-            )
-            if children_token is not None:
-                children_content = ""
-                # treat all children token as inline text
-                for child_token in children_token:
-                    children_content += child_token.value
-
-                # check for a language specifier
-                lines = children_content.split("\n")
-                # there must be at least one other non-empty line
-                # (the content doesn't matter, there just has to be one)
-                non_empty_line_found = False
-                lang = None
-                for line_index in range(1, len(lines)):
-                    if len(lines[line_index]) > 0:
-                        non_empty_line_found = True
-                        break
-                if non_empty_line_found:
-                    match = re.fullmatch(r"([a-zA-Z0-9-]*)(.*)", lines[0])
-                    # if there is any behind the lang spec, then it is normal text
-                    # otherwise, it is either a lang spec (gets removed from the
-                    # displayed text) or it is empty (newline gets removed)
-                    if len(match[2]) == 0:
-                        lines = lines[1:]  # remove first line from code block
-                        if len(match[1]) > 0:
-                            lang = match[1]
-
-                children_content = "\n".join(lines)
-                child_node = Node(NodeType.TEXT, text_content=children_content)
-                yield Node(NodeType.CODE_BLOCK, code_lang=lang, children=[child_node])
-                i += 1 + amount_consumed_tokens
-                continue
+    return root_nodes
 
-        # === quote blocks
-        # these are a bit trickier. essentially, quote blocks are also
-        # "just another text modifier" but with a few more complicated rules
-        # - quote blocks always have "> " at the very beginning of every line
-        # - quote blocks can span multiple lines, meaning that if multiple consecutive
-        #   lines start with "> ", then they belong to the same quote block
-        # - quote blocks can't be nested. any quote delimiters inside a quote block
-        #   are just inline text. all other elements can appear inside a quote block
-        # - text modifiers
-        children_token_in_quote_block = []
-        # note that in_quote won't change during the while-loop, we're just reducing
-        # the level of indentation here by including it in the condition instead of
-        # making an additional if statement around the while loop
-        while (
-            not in_quote
-            and i < len(tokens)
-            and tokens[i].token_type == TokenType.QUOTE_LINE_PREFIX
-        ):
-            # scan until next newline
-            for j in range(i, len(tokens)):
-                if tokens[j].token_type == TokenType.NEWLINE:
-                    # add everything from the quote line prefix (non-inclusive)
-                    # to the newline (inclusive) as children token
-                    children_token_in_quote_block.extend(tokens[i + 1 : j + 1])
-                    i = j + 1  # move to the token after the newline
-                    break
-            else:
-                # this is the last line,
-                # all remaining tokens are part of the quote block
-                children_token_in_quote_block.extend(tokens[i + 1 :])
-                i = len(tokens)  # move to the end
-                break
 
-        if len(children_token_in_quote_block) > 0:
-            # tell the inner parse function that it's now inside a quote block
-            children_nodes = list(
-                parse_tokens_generator(children_token_in_quote_block, in_quote=True)
-            )
-            yield Node(NodeType.QUOTE_BLOCK, children=children_nodes)
-            continue
-
-        # if we get all the way here, than whatever token we're currently sitting on
-        # is not an inline text token but also failed to match any of our parsing rules.
-        # this happens when a special character, such as ">" or "*" is used as part of
-        # normal text.
-        # in this case, we just treat it as normal text.
-        #
-        # TODO:
-        # note that we don't combine multiple text nodes here.
-        # we *could* do it similar to what we do in the lexer but
-        # - remembering inline text into future loop iterations would require adding
-        #   a check to every yield-continue combo in this function, which would be quite
-        #   ugly
-        # - we can't change previous segments without dropping the generator
-        #   functionality (even though that *is* the current workaround)
-        # - we can't look ahead without simulating this entire function on future tokens
-        # if you know how to do this *without adding ugly code*: help is appreciated.
-        # until then, this is a case of "we'll cross that bridge when we get there",
-        # i.e., we'll fix it if anyone comes along that actually needs it
-        yield Node(NodeType.TEXT, current_token.value)
-        i += 1
-
-
-def try_parse_node_with_children(
-    tokens: List[Token],
-    opener: List[TokenType],
-    closer: List[TokenType],
-    node_type: NodeType,
-    in_quote: bool,
-) -> Tuple[Optional[Node], Optional[int]]:
+def flush_text_run(nodes: List[Node], text_run: List[str]):
     """
-    Tries identify a node at the start of the specified sequence of tokens by
-    checking for the opener and then searching for the closer.
+    Appends the text collected since the last non-TEXT node as a single TEXT node, if
+    there is any, and clears the collected text.
 
-    Will create a Node with the specified NodeType if the opener and closer matched.
-    Will also call parse_tokens_generator on the child tokens, which means that the
-    Node returned by this function will be fully parsed.
+    This must be called before appending any other node so that the text ends up in
+    the right place.
+    """
+    if len(text_run) > 0:
+        nodes.append(Node(NodeType.TEXT, text_content="".join(text_run)))
+        text_run.clear()
+
+
+def try_match_node_with_children(
+    type_tags: bytes,
+    start: int,
+    end: int,
+    opener: bytes,
+    closer: bytes,
+) -> int:
+    """
+    Tries identify a node at the specified start index of the sequence of tokens by
+    checking for the opener and then searching for the closer before the end index.
 
-    Will relay the supplied in_quote to the parse_tokens_generator used to parse the
-    child tokens.
+    The tokens are given by their type tags and so are the opener and the closer, see
+    encode_token_types. This way, the search for the closer is a single bytes.find,
+    which compares the tokens in C instead of going through them one by one.
 
-    Returns the parsed Node and the total amount of tokens consumed, i.e., the amount
-    of child tokens plus the size of the opener and closer.
-    Returns None, None if the opener was not found at the beginning or closer was not
-    found anywhere in the token sequence.
+    Returns the index at which the closer starts, i.e., the children of the node are
+    the tokens between the opener and that index.
+    Returns -1 if the opener was not found at the start index or closer was not
+    found anywhere after it.
     """
     # if there aren't enough tokens to match this node type, abort immediately
     # +1 because there needs to be at least one child token
-    if len(tokens) < len(opener) + 1 + len(closer):
-        return None, None
+    if end - start < len(opener) + 1 + len(closer):
+        return -1
 
     # check if the opener matches
-    for opener_index in range(len(opener)):
-        if tokens[opener_index].token_type != opener[opener_index]:
-            return None, None
+    if not type_tags.startswith(opener, start):
+        return -1
 
     # try finding the matching closer and consume as few tokens as possible
     # (skip the first token as that has to be a child token)
+    # (find only matches if the whole closer fits before the end index)
     # TODO: edge case ***bold and italic*** doesn't work
-    children_token, amount_consumed_tokens = search_for_closer(
-        tokens[len(opener) + 1 :], closer
-    )
-
-    if children_token is None:
-        # closer not found, abort trying to parse as the selected node type
-        return None, None
-
-    # put first child token back in
-    children_token = (tokens[len(opener)], *children_token)
-    amount_consumed_tokens += len(opener) + 1
-
-    return (
-        Node(
-            node_type,
-            children=list(parse_tokens_generator(children_token, in_quote)),
-        ),
-        amount_consumed_tokens,
-    )
+    return type_tags.find(closer, start + len(opener) + 1, end)
 
 
-def search_for_closer(
-    tokens: List[Token], closer: List[TokenType]
-) -> Tuple[Optional[List[Token]], Optional[int]]:
+def encode_token_types(token_types: Iterable[TokenType]) -> bytes:
     """
-    Searches for a specified closing sequence in the supplied list of tokens.
+    Encodes a sequence of token types as a byte string, with each byte being the value
+    of the token type at the same index (=its type tag).
 
-    Returns a 2-tuple containing the tokens before the closing sequence starts and the
-    amount of tokens that are consumed by this match, i.e., the amount of tokens in the
-    first return value plus the length of the closing sequence.
-
-    Returns None, None if the closer was not found.
+    Sequences of token types, e.g., the delimiters of text modifiers, can then be
+    searched for in the type tags of a list of tokens using bytes.find and
+    bytes.startswith.
     """
-    # iterate over tokens
-    for token_index in range(len(tokens) - len(closer) + 1):
-        # try matching the closer to the current position by iterating over the closer
-        for closer_index in range(len(closer)):
-            if tokens[token_index + closer_index].token_type != closer[closer_index]:
-                break
-        else:
-            # closer matched
-            return tokens[:token_index], token_index + len(closer)
-        # closer didn't match, try next token_index
-
-    # closer was not found
-    return None
+    return bytes([token_type.value for token_type in token_types])
+
+
+# type tags of single tokens, as found in the type tags of a list of tokens
+TEXT_INLINE_TAG = TokenType.TEXT_INLINE.value
+NEWLINE_TAG = TokenType.NEWLINE.value
+QUOTE_LINE_PREFIX_TAG = TokenType.QUOTE_LINE_PREFIX.value
+CODE_BLOCK_DELIMITER_TAG = TokenType.CODE_BLOCK_DELIMITER.value
+
+# type tags of the delimiters of text modifiers and code blocks
+BOLD_DELIMITER = encode_token_types([TokenType.STAR, TokenType.STAR])
+UNDERLINE_DELIMITER = encode_token_types([TokenType.UNDERSCORE, TokenType.UNDERSCORE])
+STRIKETHROUGH_DELIMITER = encode_token_types([TokenType.TILDE, TokenType.TILDE])
+ITALIC_STAR_DELIMITER = encode_token_types([TokenType.STAR])
+ITALIC_UNDERSCORE_DELIMITER = encode_token_types([TokenType.UNDERSCORE])
+SPOILER_DELIMITER = encode_token_types([TokenType.SPOILER_DELIMITER])
+CODE_INLINE_DELIMITER = encode_token_types([TokenType.CODE_INLINE_DELIMITER])
+CODE_BLOCK_DELIMITER = encode_token_types([TokenType.CODE_BLOCK_DELIMITER])
+
+# format: delimiter, type
+# the delimiter is used as both the opener and the closer.
+# these are tried in this order, so the longer delimiters have to come first
+text_modifiers = (
+    (BOLD_DELIMITER, NodeType.BOLD),
+    (UNDERLINE_DELIMITER, NodeType.UNDERLINE),
+    (STRIKETHROUGH_DELIMITER, NodeType.STRIKETHROUGH),
+    (ITALIC_STAR_DELIMITER, NodeType.ITALIC),
+    (ITALIC_UNDERSCORE_DELIMITER, NodeType.ITALIC),
+    (SPOILER_DELIMITER, NodeType.SPOILER),
+    (CODE_INLINE_DELIMITER, NodeType.CODE_INLINE),
+)
+
+# the same, but only the text modifiers whose delimiter starts with the token of the
+# type tag used as the index, keeping their order
+text_modifiers_by_tag = [
+    tuple(
+        (delimiter, node_type)
+        for delimiter, node_type in text_modifiers
+        if delimiter[0] == tag
+    )
+    for tag in range(256)
+]
@@ -0,0 +1,22 @@
+import time
+
+from discord_markdown_ast_parser.lexer import TokenType, lex
+
+
+def test_url_regex_does_not_backtrack():
+    # the original URL regex took exponential time on an unclosed <http:// followed
+    # by percent-encoded characters, about tens of seconds for this many
+    url = "http://" + "%20" * 12
+
+    start = time.perf_counter()
+    tokens = list(lex("<" + url))
+    assert time.perf_counter() - start < 1
+
+    assert [(token.token_type, token.value) for token in tokens] == [
+        (TokenType.TEXT_INLINE, "<"),
+        (TokenType.URL_WITH_PREVIEW, url),
+    ]
+    tokens = list(lex("<" + url + ">"))
+    assert [(token.token_type, token.value) for token in tokens] == [
+        (TokenType.URL_WITHOUT_PREVIEW, "<" + url + ">"),
+    ]
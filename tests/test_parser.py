@@ -0,0 +1,92 @@
+from discord_markdown_ast_parser import parse_to_dict
+from discord_markdown_ast_parser.parser import Node, NodeType
+
+
+def test_quote_block_prints_nothing(capsys):
+    assert parse_to_dict("> hi") == [
+        {
+            "node_type": "QUOTE_BLOCK",
+            "children": [{"node_type": "TEXT", "text_content": "hi"}],
+        }
+    ]
+    assert capsys.readouterr().out == ""
+
+
+def test_unclosed_text_modifiers_are_text():
+    # an opener without a closer used to make the parser unpack a bare None
+    assert parse_to_dict("*a _") == [{"node_type": "TEXT", "text_content": "*a _"}]
+    assert parse_to_dict("_a *") == [{"node_type": "TEXT", "text_content": "_a *"}]
+
+
+def test_many_nested_delimiters():
+    # a closer is always the next matching delimiter, so this ends up as a long run
+    # of italics (with the delimiters of the other kind as their text). either way,
+    # the parser must not run into the recursion limit
+    text = "*_" * 5000 + "x" + "_*" * 5000
+
+    nodes = parse_to_dict(text)
+    assert len(nodes) == 6667
+    for node in nodes:
+        assert node["node_type"] == "ITALIC"
+        assert len(node["children"]) == 1
+        assert node["children"][0]["text_content"] in ("*", "_", "x")
+
+
+def test_deep_tree_to_dict():
+    # nodes are converted to dicts without recursion
+    depth = 5000
+    node = Node(NodeType.TEXT, text_content="x")
+    for _ in range(depth):
+        node = Node(NodeType.BOLD, children=[node])
+
+    node_dict = node.to_dict()
+    for _ in range(depth):
+        assert node_dict["node_type"] == "BOLD"
+        assert len(node_dict["children"]) == 1
+        node_dict = node_dict["children"][0]
+    assert node_dict == {"node_type": "TEXT", "text_content": "x"}
+
+
+def test_quote_block_spanning_lines():
+    assert parse_to_dict("> a *b\n> c* d\n> e\nf") == [
+        {
+            "node_type": "QUOTE_BLOCK",
+            "children": [
+                {"node_type": "TEXT", "text_content": "a "},
+                {
+                    "node_type": "ITALIC",
+                    "children": [{"node_type": "TEXT", "text_content": "b\nc"}],
+                },
+                {"node_type": "TEXT", "text_content": " d\ne\n"},
+            ],
+        },
+        {"node_type": "TEXT", "text_content": "f"},
+    ]
+
+
+def test_code_block_with_lang_spec():
+    assert parse_to_dict("```py\nprint()\n```") == [
+        {
+            "node_type": "CODE_BLOCK",
+            "code_lang": "py",
+            "children": [{"node_type": "TEXT", "text_content": "print()\n"}],
+        }
+    ]
+
+
+def test_code_block_with_empty_first_line():
+    assert parse_to_dict("```\ncode\n```") == [
+        {
+            "node_type": "CODE_BLOCK",
+            "children": [{"node_type": "TEXT", "text_content": "code\n"}],
+        }
+    ]
+
+
+def test_code_block_without_lang_spec():
+    assert parse_to_dict("```not a spec\ncode\n```") == [
+        {
+            "node_type": "CODE_BLOCK",
+            "children": [{"node_type": "TEXT", "text_content": "not a spec\ncode\n"}],
+        }
+    ]